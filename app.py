@@ -11,8 +11,14 @@ from preprocess import Preprocessor
 from indexer import Indexer
 from collections import OrderedDict
 from linkedlist import LinkedList
+from tracing import tracer
+from sharding import ShardCluster
+from docstore import DocStore
+from daat import evaluate_query, expand_query, rank_scores
 import inspect as inspector
 import sys
+import os
+import atexit
 import argparse
 import json
 import time
@@ -25,73 +31,38 @@ import math
 
 app = Flask(__name__)
 
+# upper bound on the "documents": k request field
+MAX_TOP_K = 100
+
+
+def _parse_top_k(value):
+    """
+    Validates the optional "documents" request field.
+    Returns None when it is absent, else an int in [1, MAX_TOP_K].
+    Raises ValueError for booleans, non-integers and values below 1.
+    """
+    if value is None:
+        return None
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise ValueError("documents must be a positive integer")
+    try:
+        k = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("documents must be a positive integer")
+    if k < 1:
+        raise ValueError("documents must be a positive integer")
+    return min(k, MAX_TOP_K)
+
 class ProjectRunner:
     def __init__(self):
         self.preprocessor = Preprocessor()
         self.indexer = Indexer()
-
-    # ✅ Added merge helper for DAAT AND
-    def _merge(self, list1, list2):
-        """
-        Merges two postings lists (DAAT AND).
-        Returns merged doc IDs and comparison count.
-        """
-        i, j = 0, 0
-        comparisons = 0
-        result = []
-        while i < len(list1) and j < len(list2):
-            comparisons += 1
-            if list1[i] == list2[j]:
-                result.append(list1[i])
-                i += 1
-                j += 1
-            elif list1[i] < list2[j]:
-                i += 1
-            else:
-                j += 1
-        return result, comparisons
-
-    # ✅ Added get_postings
-    def _get_postings(self, term):
-        """
-        Returns postings list and skip postings for a term.
-        """
-        postings, skips = [], []
-        if term in self.indexer.get_index():
-            plist = self.indexer.get_index()[term]
-            postings = plist.get_all_doc_ids()
-            if hasattr(plist, "get_skip_doc_ids"):
-                skips = plist.get_skip_doc_ids()
-        return postings, skips
-
-    # ✅ Added DAAT AND algorithm
-    def _daat_and(self, query_terms):
-        """
-        Perform DAAT AND on multiple postings lists.
-        Returns (result_docs, num_comparisons)
-        """
-        index = self.indexer.get_index()
-        if not query_terms:
-            return [], 0
-
-        postings_lists = []
-        for t in query_terms:
-            if t in index:
-                postings_lists.append(index[t].get_all_doc_ids())
-            else:
-                postings_lists.append([])
-
-        # Sort postings by length (optimization)
-        postings_lists.sort(key=len)
-
-        result = postings_lists[0]
-        total_comparisons = 0
-
-        for i in range(1, len(postings_lists)):
-            result, comp = self._merge(result, postings_lists[i])
-            total_comparisons += comp
-
-        return result, total_comparisons
+        self.docstore = None
+        # P2_SHARDS=N (N > 1) serves the index from N worker processes
+        num_shards = int(os.environ.get("P2_SHARDS", "1") or 1)
+        self.cluster = ShardCluster(num_shards) if num_shards > 1 else None
+        if self.cluster is not None:
+            atexit.register(self.cluster.close)
 
     def _output_formatter(self, op):
         """ This formats the result in the required format. """
@@ -101,16 +72,43 @@ class ProjectRunner:
         results_cnt = len(op_no_score)
         return op_no_score, results_cnt
 
+    def _read_corpus(self, corpus):
+        """
+        Reads the corpus lines and records each doc_id's byte offset and
+        length in the document store.
+        """
+        self.docstore = DocStore(corpus)
+        with open(corpus, 'rb') as fp:
+            raw_lines = fp.readlines()
+        lines, offset = [], 0
+        for raw in raw_lines:
+            line = raw.decode('utf-8')
+            self.docstore.add(self.preprocessor.get_doc_id(line)[0], offset, len(raw))
+            offset += len(raw)
+            lines.append(line)
+        self.docstore.finalize()
+        return lines
+
     def run_indexer(self, corpus):
         """ Reads & indexes the corpus. """
-        with open(corpus, 'r') as fp:
-            for line in tqdm(fp.readlines()):
-                doc_id, document = self.preprocessor.get_doc_id(line)
+        lines = self._read_corpus(corpus)
+        if self.cluster is not None:
+            with tracer.stage("index.sharded_build"):
+                self.cluster.build(lines, self.preprocessor)
+            return
+        for line in tqdm(lines):
+            doc_id, document = self.preprocessor.get_doc_id(line)
+            with tracer.stage("index.tokenize"):
                 tokenized_document = self.preprocessor.tokenizer(document)
+            with tracer.stage("index.invert"):
                 self.indexer.generate_inverted_index(doc_id, tokenized_document)
-        self.indexer.sort_terms()
-        self.indexer.add_skip_connections()
-        self.indexer.calculate_tf_idf()
+            tracer.incr("docs_indexed")
+        with tracer.stage("index.sort_terms"):
+            self.indexer.sort_terms()
+        with tracer.stage("index.skip_connections"):
+            self.indexer.add_skip_connections()
+        with tracer.stage("index.tf_idf"):
+            self.indexer.calculate_tf_idf()
 
     def sanity_checker(self, command):
         """ DO NOT MODIFY THIS. THIS IS USED BY THE GRADER. """
@@ -125,8 +123,46 @@ class ProjectRunner:
                 "node_value": str(index[kw].head.doc_id),
                 "command_result": eval(command) if "." in command else ""}
 
+    def _evaluate(self, query_terms):
+        """
+        Single-node query evaluation through daat.evaluate_query, the same
+        code each shard runs. Returns postings, skip postings, DAAT AND
+        results, counters, wildcard expansions and the tf-idf ranking in
+        the same shape as ShardCluster.query.
+        """
+        expansions = expand_query(self.indexer, self.preprocessor, query_terms)
+        evaluated = evaluate_query(self.indexer, query_terms, expansions)
+        evaluated["expansions"] = expansions
+        evaluated["tfidf"] = rank_scores(evaluated.pop("scores"))
+        return evaluated
+
+    def _retrieve(self, ranked, query_terms, expansions, top_k):
+        """
+        Returns doc_id, score, title and highlighted snippet for the top_k
+        ranked results, read from the document store. expansions maps the
+        query's wildcard terms to the index terms they were evaluated on.
+        """
+        documents = []
+        with tracer.stage("query.retrieve"):
+            for entry in ranked[:top_k]:
+                text = self.docstore.get_text(entry["doc_id"]) or ""
+                documents.append({"doc_id": entry["doc_id"],
+                                  "score": entry["score"],
+                                  "title": self.docstore.title(text),
+                                  "snippet": self.docstore.snippet(
+                                      text, query_terms, self.preprocessor, expansions)})
+        tracer.incr("docs_retrieved", len(documents))
+        return documents
+
     # ✅ Core logic for running all queries
-    def run_queries(self, query_list, random_command):
+    def run_queries(self, query_list, random_command, traces=None, documents=None, top_k=10):
+        """
+        Runs every query and builds the grader output.
+        If `traces` is a dict and tracing is enabled, it is filled with a
+        per-query breakdown of stage timings and counters.
+        If `documents` is a dict, it is filled with titles and snippets of
+        each query's top_k tf-idf results.
+        """
         output_dict = {
             'postingsList': {},
             'postingsListSkip': {},
@@ -134,52 +170,59 @@ class ProjectRunner:
             'daatAndSkip': {},
             'daatAndTfIdf': {},
             'daatAndSkipTfIdf': {},
-            'sanity': self.sanity_checker(random_command)
+            # the front end of a sharded deployment holds no index to sample
+            'sanity': self.sanity_checker(random_command) if self.cluster is None else {}
         }
 
         for query in tqdm(query_list):
-            query_terms = self.preprocessor.tokenizer(query)
-            term_postings = {}
-            index = self.indexer.get_index()
-
-            for term in query_terms:
-                postings, skip_postings = self._get_postings(term)
-                output_dict['postingsList'][term] = postings
-                output_dict['postingsListSkip'][term] = skip_postings
-
-            # Perform DAAT AND
-            and_result, and_comp = self._daat_and(query_terms)
-            and_skip_result, and_skip_comp = self._daat_and(query_terms)  # identical since skip simulation
-
-            # Simulate TF-IDF sorting
-            tfidf_map = {}
-            N = len(index)
-            for term in query_terms:
-                if term in index:
-                    plist = index[term]
-                    for node in plist.get_all_nodes():
-                        tfidf_map[node.doc_id] = tfidf_map.get(node.doc_id, 0) + node.tf_idf
-            tfidf_sorted = sorted(
-                [{"doc_id": doc, "score": round(score, 6)} for doc, score in tfidf_map.items() if doc in and_result],
-                key=lambda x: x["score"], reverse=True
-            )
-
-            # Format output
-            and_op_no_score_no_skip, and_results_cnt_no_skip = self._output_formatter(and_result)
-            and_op_no_score_skip, and_results_cnt_skip = self._output_formatter(and_skip_result)
-
-            output_dict['daatAnd'][query.strip()] = {
-                "results": and_op_no_score_no_skip,
-                "num_docs": and_results_cnt_no_skip,
-                "num_comparisons": and_comp
-            }
-            output_dict['daatAndSkip'][query.strip()] = {
-                "results": and_op_no_score_skip,
-                "num_docs": and_results_cnt_skip,
-                "num_comparisons": and_skip_comp
-            }
-            output_dict['daatAndTfIdf'][query.strip()] = tfidf_sorted
-            output_dict['daatAndSkipTfIdf'][query.strip()] = tfidf_sorted
+            with tracer.query() as trace:
+                with tracer.stage("query.tokenize"):
+                    query_terms = self.preprocessor.query_tokenizer(query)
+                if self.cluster is not None:
+                    with tracer.stage("query.scatter_gather"):
+                        evaluated = self.cluster.query(query_terms)
+                else:
+                    evaluated = self._evaluate(query_terms)
+
+                for term in query_terms:
+                    output_dict['postingsList'][term] = evaluated["postings"][term]
+                    output_dict['postingsListSkip'][term] = evaluated["skips"][term]
+
+                # Skip evaluation is simulated, so both variants share one result
+                and_result, and_comp = evaluated["results"], evaluated["comparisons"]
+                and_skip_result, and_skip_comp = and_result, and_comp
+                tfidf_sorted = evaluated["tfidf"]
+                # counted here so sharded mode reports the workers' totals too
+                if tracer.enabled:
+                    tracer.incr("comparisons", and_comp)
+                    tracer.incr("postings_scanned", evaluated["postings_scanned"])
+                    tracer.incr("wildcard_terms", sum(len(t) for t in evaluated["expansions"].values()))
+                    tracer.incr("result_docs", len(and_result))
+
+                # Format output
+                and_op_no_score_no_skip, and_results_cnt_no_skip = self._output_formatter(and_result)
+                and_op_no_score_skip, and_results_cnt_skip = self._output_formatter(and_skip_result)
+
+                output_dict['daatAnd'][query.strip()] = {
+                    "results": and_op_no_score_no_skip,
+                    "num_docs": and_results_cnt_no_skip,
+                    "num_comparisons": and_comp
+                }
+                output_dict['daatAndSkip'][query.strip()] = {
+                    "results": and_op_no_score_skip,
+                    "num_docs": and_results_cnt_skip,
+                    "num_comparisons": and_skip_comp
+                }
+                output_dict['daatAndTfIdf'][query.strip()] = tfidf_sorted
+                output_dict['daatAndSkipTfIdf'][query.strip()] = tfidf_sorted
+
+                if documents is not None:
+                    documents[query.strip()] = self._retrieve(
+                        tfidf_sorted, query_terms, evaluated["expansions"], top_k)
+
+            if traces is not None and trace.breakdown is not None:
+                trace.breakdown["result_size"] = len(and_result)
+                traces[query.strip()] = trace.breakdown
 
         return output_dict
 
@@ -191,18 +234,40 @@ def execute_query():
     queries = request.json["queries"]
     random_command = request.json["random_command"]
 
-    output_dict = runner.run_queries(queries, random_command)
-    with open(output_location, 'w') as fp:
-        json.dump(output_dict, fp)
+    # Optional per-query breakdown, only returned when tracing is enabled
+    traces = {} if request.json.get("trace") and tracer.enabled else None
+    # Optional titles and snippets for the top k results ("documents": k)
+    try:
+        top_k = _parse_top_k(request.json.get("documents"))
+    except ValueError as e:
+        return flask.jsonify({"error": str(e)}), 400
+    documents = {} if top_k is not None else None
+
+    with tracer.profile("execute_query"):
+        with tracer.stage("request.run_queries"):
+            output_dict = runner.run_queries(queries, random_command, traces, documents, top_k)
+        with tracer.stage("request.json_dump"):
+            with open(output_location, 'w') as fp:
+                json.dump(output_dict, fp)
 
     response = {
         "Response": output_dict,
         "time_taken": str(time.time() - start_time),
         "username_hash": username_hash
     }
+    if traces is not None:
+        response["trace"] = traces
+    if documents is not None:
+        response["documents"] = documents
     return flask.jsonify(response)
 
 
+@app.route("/metrics", methods=['GET'])
+def metrics():
+    """ Aggregate stage timers and counters collected by the tracer. """
+    return flask.jsonify(tracer.metrics())
+
+
 if __name__ == "__main__":
     """ DO NOT CHANGE THIS DRIVER. """
     output_location = "project2_output.json"
@@ -0,0 +1,155 @@
+"""
+@author: Charan Kumar Raju
+Institute: University at Buffalo
+
+Micro-benchmarks for Project 2 (CSE 4/535)
+Usage:
+    python bench.py startup [--runs 5]
+    python bench.py termdict [--corpus data/input_corpus.txt]
+    python bench.py docstore [--corpus data/input_corpus.txt] [--k 10 100]
+"""
+
+import argparse
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+# Each snippet runs in a fresh interpreter, so module import cost is included.
+STARTUP_SNIPPETS = {
+    "import preprocess": "import preprocess",
+    "import app": "import app",
+    "first tokenize (nltk)": "from preprocess import Preprocessor; "
+                             "Preprocessor('nltk').tokenizer('the novel coronavirus')",
+    "first tokenize (porter)": "from preprocess import Preprocessor; "
+                               "Preprocessor('porter').tokenizer('the novel coronavirus')",
+}
+
+
+def _time_snippet(snippet, runs):
+    """Median wall time (ms) of `python -c snippet` over `runs` cold starts."""
+    timer = ("import time; _t = time.perf_counter(); %s; "
+             "print((time.perf_counter() - _t) * 1000)" % snippet)
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", timer],
+                             capture_output=True, text=True)
+        if out.returncode != 0:
+            return None, out.stderr.strip().splitlines()[-1]
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return statistics.median(samples), None
+
+
+def bench_startup(args):
+    """Measure cold-start cost of the modules loaded by app.py and pool workers."""
+    for name, snippet in STARTUP_SNIPPETS.items():
+        ms, err = _time_snippet(snippet, args.runs)
+        if err:
+            print("%-26s failed: %s" % (name, err))
+        else:
+            print("%-26s %9.2f ms" % (name, ms))
+
+
+def _build_indexer(corpus):
+    from preprocess import Preprocessor
+    from indexer import Indexer
+    preprocessor, indexer = Preprocessor(), Indexer()
+    with open(corpus, 'r') as fp:
+        for line in fp:
+            doc_id, document = preprocessor.get_doc_id(line)
+            indexer.generate_inverted_index(doc_id, preprocessor.tokenizer(document))
+    indexer.sort_terms()
+    return indexer
+
+
+def _per_call_us(fn, items, repeat=3):
+    """Best-of-`repeat` mean microseconds per fn(item)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = min(best, time.perf_counter() - start)
+    return best * 1e6 / max(1, len(items))
+
+
+def bench_termdict(args):
+    """Compare the front-coded term dictionary with the OrderedDict of terms."""
+    indexer = _build_indexer(args.corpus)
+    index, term_dict = indexer.get_index(), indexer.term_dict
+    terms = list(index.keys())
+
+    # the dict table plus its str keys; postings are shared by both and excluded
+    dict_bytes = sys.getsizeof(index) + sum(sys.getsizeof(t) for t in terms)
+    print("terms                      %9d" % len(terms))
+    print("OrderedDict + str keys     %9d bytes" % dict_bytes)
+    print("TermDictionary             %9d bytes" % term_dict.nbytes())
+    # postings_lists holds one reference per ordinal; the postings themselves are shared
+    added = term_dict.nbytes() + sys.getsizeof(indexer.postings_lists)
+    print("postings by ordinal        %9d bytes" % sys.getsizeof(indexer.postings_lists))
+    # the Indexer keeps the OrderedDict, so both are added memory
+    print("net change (dict kept)     %+9d bytes" % added)
+
+    print("exact lookup (dict)        %9.3f us" % _per_call_us(index.__contains__, terms))
+    print("exact lookup (termdict)    %9.3f us" % _per_call_us(term_dict.lookup, terms))
+
+    prefixes = sorted({t[:n] + "*" for t in terms for n in (2, 4, 6) if len(t) > n})
+    expand = lambda p: term_dict.expand(p, args.limit)
+    scan = lambda p: [t for t in terms if t.startswith(p[:-1])][:args.limit]
+    print("prefix patterns            %9d" % len(prefixes))
+    print("expand (termdict)          %9.3f us" % _per_call_us(expand, prefixes, repeat=1))
+    print("expand (linear scan)       %9.3f us" % _per_call_us(scan, prefixes[:200], repeat=1))
+
+
+def bench_docstore(args):
+    """Latency of fetching titles and snippets for k results from the document store."""
+    from preprocess import Preprocessor
+    from docstore import DocStore
+    from daat import expand_query
+    preprocessor, store = Preprocessor(), DocStore(args.corpus)
+    offset = 0
+    with open(args.corpus, 'rb') as fp:
+        for raw in fp:
+            store.add(preprocessor.get_doc_id(raw.decode('utf-8'))[0], offset, len(raw))
+            offset += len(raw)
+    store.finalize()
+
+    doc_ids = list(store.doc_ids)
+    query_terms = preprocessor.query_tokenizer("novel coronavirus corona* pandemic")
+    expansions = expand_query(_build_indexer(args.corpus), preprocessor, query_terms)
+    rng = random.Random(0)
+    print("documents                  %9d" % len(store))
+    print("offset index               %9d bytes" % sum(a.itemsize * len(a) for a in
+                                                        (store.doc_ids, store.offsets, store.lengths)))
+    for k in args.k:
+        batches = [rng.sample(doc_ids, min(k, len(doc_ids))) for _ in range(args.batches)]
+        fetch = lambda batch: [store.get_text(d) for d in batch]
+        render = lambda batch: [(store.title(t), store.snippet(t, query_terms, preprocessor, expansions))
+                                for t in (store.get_text(d) for d in batch)]
+        print("k=%-4d get_text           %9.1f us" % (k, _per_call_us(fetch, batches)))
+        print("k=%-4d title + snippet    %9.1f us" % (k, _per_call_us(render, batches)))
+    store.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    startup = sub.add_parser("startup", help="Cold-start import and first-use latency.")
+    startup.add_argument("--runs", type=int, default=5, help="Cold starts per measurement.")
+    startup.set_defaults(func=bench_startup)
+
+    termdict = sub.add_parser("termdict", help="Term dictionary size, lookup and wildcard expansion.")
+    termdict.add_argument("--corpus", type=str, default="data/input_corpus.txt", help="Corpus File name, with path.")
+    termdict.add_argument("--limit", type=int, default=64, help="Max terms per wildcard expansion.")
+    termdict.set_defaults(func=bench_termdict)
+
+    docstore = sub.add_parser("docstore", help="Title and snippet retrieval latency for top-k results.")
+    docstore.add_argument("--corpus", type=str, default="data/input_corpus.txt", help="Corpus File name, with path.")
+    docstore.add_argument("--k", type=int, nargs="+", default=[10, 100], help="Result counts to fetch.")
+    docstore.add_argument("--batches", type=int, default=200, help="Random result sets per k.")
+    docstore.set_defaults(func=bench_docstore)
+
+    argv = parser.parse_args()
+    argv.func(argv)
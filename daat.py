@@ -8,9 +8,12 @@ Implements:
     • daat_and() – standard DAAT AND
     • daat_and_with_skips() – uses skip pointers
     • rank_by_tfidf() – ranks DAAT results by TF-IDF scores
+    • expand_query() / evaluate_query() / rank_scores() – the query
+      evaluation shared by app.ProjectRunner and sharding.Shard
 """
 
 from math import sqrt
+from tracing import tracer
 
 
 # -------------------------------------------------------------
@@ -178,3 +181,107 @@ def rank_by_tfidf(doc_ids, terms, inverted_index):
     ranked = sorted(scores.items(), key=lambda x: (-x[1], x[0]))
     # return as list of dicts for JSON friendliness
     return [{"doc_id": d, "score": round(s, 6)} for d, s in ranked]
+
+
+# -------------------------------------------------------------
+#  Shared query evaluation (app.ProjectRunner, sharding.Shard)
+# -------------------------------------------------------------
+def merge_postings(list1, list2):
+    """Return (doc_id list, num comparisons) for two sorted doc_id lists."""
+    i, j = 0, 0
+    comparisons = 0
+    result = []
+    while i < len(list1) and j < len(list2):
+        comparisons += 1
+        if list1[i] == list2[j]:
+            result.append(list1[i])
+            i += 1
+            j += 1
+        elif list1[i] < list2[j]:
+            i += 1
+        else:
+            j += 1
+    return result, comparisons
+
+
+def rank_key(item):
+    """Sort (doc_id, score) by rounded score desc, then doc_id asc."""
+    return -round(item[1], 6), item[0]
+
+
+def rank_scores(scores, k=None):
+    """Turn {doc_id: score} into the ranked [{"doc_id", "score"}] output, cut to k."""
+    ranked = sorted(scores.items(), key=rank_key)
+    if k is not None:
+        ranked = ranked[:k]
+    return [{"doc_id": d, "score": round(s, 6)} for d, s in ranked]
+
+
+def expand_query(indexer, preprocessor, query_terms):
+    """Return {wildcard term: [index terms]} for the wildcard terms of a query."""
+    expansions = {}
+    with tracer.stage("query.wildcard_expand"):
+        for term in query_terms:
+            if "*" in term and term not in expansions:
+                expansions[term] = [t for t, _ in indexer.expand_wildcard(
+                    preprocessor.wildcard_patterns(term))]
+    return expansions
+
+
+def _term_plists(index, term, expansions):
+    """Postings lists a query term reads: its expansions, itself, or none."""
+    if term in expansions:
+        return [index[t] for t in expansions[term] if t in index]
+    return [index[term]] if term in index else []
+
+
+def evaluate_query(indexer, query_terms, expansions=None, k=None):
+    """
+    Evaluate a tokenized query against one Indexer.
+
+    Wildcard terms (keys of `expansions`) read the OR of their expanded
+    terms' postings and have no skips. The AND intersects the postings
+    lists shortest first. Returns postings and skip postings per term,
+    the AND results, comparisons, postings scanned and the unrounded
+    tf-idf scores of the top k AND results (all when k is None).
+    """
+    index = indexer.get_index()
+    expansions = expansions or {}
+    postings, skips = {}, {}
+    with tracer.stage("query.postings_lookup"):
+        for term in query_terms:
+            if term in expansions:
+                docs = set()
+                for plist in _term_plists(index, term, expansions):
+                    docs.update(plist.get_all_doc_ids())
+                postings[term], skips[term] = sorted(docs), []
+            elif term in index:
+                postings[term] = index[term].get_all_doc_ids()
+                skips[term] = index[term].get_skip_doc_ids()
+            else:
+                postings[term], skips[term] = [], []
+
+    result, comparisons, scanned = [], 0, 0
+    if query_terms:
+        # Sort postings by length (optimization)
+        postings_lists = sorted((postings[t] for t in query_terms), key=len)
+        scanned = sum(len(p) for p in postings_lists)
+        result = postings_lists[0]
+        with tracer.stage("query.intersect"):
+            for i in range(1, len(postings_lists)):
+                result, comp = merge_postings(result, postings_lists[i])
+                comparisons += comp
+
+    with tracer.stage("query.tf_idf_rank"):
+        matched = set(result)
+        scores = {}
+        for term in query_terms:
+            for plist in _term_plists(index, term, expansions):
+                for node in plist.get_all_nodes():
+                    if node.doc_id in matched:
+                        scores[node.doc_id] = scores.get(node.doc_id, 0) + node.tfidf
+        if k is not None:
+            scores = dict(sorted(scores.items(), key=rank_key)[:k])
+
+    return {"postings": postings, "skips": skips, "results": result,
+            "comparisons": comparisons, "postings_scanned": scanned, "scores": scores}
@@ -0,0 +1,137 @@
+"""
+@author: Charan Kumar Raju
+Institute: University at Buffalo
+
+Document store for Project 2 (CSE 4/535)
+Keeps a compact doc_id -> (byte offset, length) index into the corpus file,
+recorded while run_indexer reads it. Text is read back through mmap, so
+the full corpus is never held in memory.
+
+Provides:
+    • DocStore.add()      – record one corpus line during indexing
+    • DocStore.finalize() – sort the offset index and map the file
+    • DocStore.get_text() – document text for a doc_id
+    • DocStore.title()    – shortened text for result lists
+    • DocStore.snippet()  – window around the query terms, highlighted
+
+Both title() and snippet() return HTML-escaped text, so clients can render
+them as HTML; snippet() adds only its own highlight markup.
+"""
+
+import bisect
+import html
+import mmap
+import re
+from array import array
+
+_WORD = re.compile(r'[A-Za-z0-9]+')
+
+
+class DocStore:
+    def __init__(self, path):
+        """Initialize an empty offset index over the corpus file at path."""
+        self.path = path
+        self.doc_ids = array('q')
+        self.offsets = array('q')
+        self.lengths = array('I')
+        self._sorted = True
+        self._fp = None
+        self._mm = None
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def add(self, doc_id, offset, length):
+        """Record that doc_id's line starts at byte offset and spans length bytes."""
+        if self.doc_ids and doc_id < self.doc_ids[-1]:
+            self._sorted = False
+        self.doc_ids.append(doc_id)
+        self.offsets.append(offset)
+        self.lengths.append(length)
+
+    def _sort(self):
+        order = sorted(range(len(self.doc_ids)), key=self.doc_ids.__getitem__)
+        self.doc_ids = array('q', (self.doc_ids[i] for i in order))
+        self.offsets = array('q', (self.offsets[i] for i in order))
+        self.lengths = array('I', (self.lengths[i] for i in order))
+        self._sorted = True
+
+    def finalize(self):
+        """
+        Sort the offset index and open the mmap once indexing is done, so
+        concurrent request threads only ever read the store.
+        """
+        if not self._sorted:
+            self._sort()
+        if self.doc_ids:
+            self._map()
+
+    def _map(self):
+        if self._mm is None:
+            self._fp = open(self.path, 'rb')
+            self._mm = mmap.mmap(self._fp.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mm
+
+    def get_text(self, doc_id):
+        """
+        Return the text of doc_id (without its id column), or None if unknown.
+        Call finalize() first when the store is shared between threads.
+        """
+        if not self._sorted:
+            self._sort()
+        i = bisect.bisect_left(self.doc_ids, doc_id)
+        if i == len(self.doc_ids) or self.doc_ids[i] != doc_id:
+            return None
+        start = self.offsets[i]
+        line = self._map()[start:start + self.lengths[i]].decode('utf-8')
+        return line.split("\t", 1)[-1].strip()
+
+    def title(self, text, max_chars=120):
+        """Shorten text to at most max_chars, cutting at a word boundary, and HTML-escape it."""
+        if len(text) <= max_chars:
+            return html.escape(text)
+        cut = text.rfind(" ", 0, max_chars)
+        return html.escape(text[:cut if cut > 0 else max_chars]) + "…"
+
+    def snippet(self, text, query_terms, preprocessor, expansions=None, window=30,
+                mark=("<em>", "</em>")):
+        """
+        Return a window of about `window` words around the first query term
+        hit, with every hit wrapped in `mark`. A word is a hit when its
+        preprocessed stem is a query term or one of the index terms a
+        wildcard term expanded to (expansions: {wildcard term: [terms]}).
+        The corpus text is HTML-escaped; `mark` is inserted as-is.
+        """
+        terms = {t for t in query_terms if "*" not in t}
+        for expanded in (expansions or {}).values():
+            terms.update(expanded)
+        words = list(_WORD.finditer(text))
+        hits = []
+        for i, m in enumerate(words):
+            word = m.group().lower()
+            if word not in preprocessor.stop_words and preprocessor.stem(word) in terms:
+                hits.append(i)
+
+        if not words:
+            return ""
+        first = max(0, hits[0] - window // 3) if hits else 0
+        last = min(len(words), first + window)
+        start, end = words[first].start(), words[last - 1].end()
+
+        out, pos = [], start
+        hit_set = set(hits)
+        for i in range(first, last):
+            if i in hit_set:
+                m = words[i]
+                out.append(html.escape(text[pos:m.start()]))
+                out.append(mark[0] + html.escape(m.group()) + mark[1])
+                pos = m.end()
+        out.append(html.escape(text[pos:end]))
+        return ("… " if first > 0 else "") + "".join(out) + (" …" if last < len(words) else "")
+
+    def close(self):
+        """Release the mmap and file handle."""
+        if self._mm is not None:
+            self._mm.close()
+            self._fp.close()
+            self._mm = self._fp = None
@@ -4,9 +4,13 @@ Institute: University at Buffalo
 '''
 
 from linkedlist import LinkedList
+from termdict import TermDictionary
 from collections import OrderedDict
 import math
 
+# upper bound on the number of terms a wildcard query term expands to
+MAX_EXPANSIONS = 64
+
 
 class Indexer:
     def __init__(self):
@@ -14,6 +18,10 @@ class Indexer:
         self.inverted_index = OrderedDict({})
         # optional: store document lengths (token counts) for tf normalization
         self.doc_token_counts = {}
+        # built by sort_terms: compact sorted term dictionary and the
+        # postings list at each term ordinal
+        self.term_dict = TermDictionary(())
+        self.postings_lists = []
 
     def get_index(self):
         """Return the inverted index (already implemented)."""
@@ -44,11 +52,28 @@ class Indexer:
             postings_list.insert(doc_id_)
 
     def sort_terms(self):
-        """Sort the index by term keys (already implemented)."""
-        sorted_index = OrderedDict({})
-        for k in sorted(self.inverted_index.keys()):
-            sorted_index[k] = self.inverted_index[k]
-        self.inverted_index = sorted_index
+        """
+        Sort the index by term keys in place and build the term dictionary
+        used for wildcard expansion.
+        """
+        sorted_terms = sorted(self.inverted_index.keys())
+        for k in sorted_terms:
+            self.inverted_index.move_to_end(k)
+        self.term_dict = TermDictionary(sorted_terms)
+        self.postings_lists = list(self.inverted_index.values())
+
+    def expand_wildcard(self, patterns, limit=MAX_EXPANSIONS):
+        """
+        Return [(term, postings list)] for the index terms matching any of
+        the wildcard patterns (e.g. ["studies*", "studi"]), in term order
+        and at most `limit` of them.
+        """
+        matches = {}
+        for pattern in patterns:
+            for ordinal, term in self.term_dict.expand(pattern, limit):
+                matches[ordinal] = term
+        return [(term, self.postings_lists[ordinal])
+                for ordinal, term in sorted(matches.items())[:limit]]
 
     def add_skip_connections(self):
         """
@@ -75,7 +100,18 @@ class Indexer:
                 if j < L:
                     nodes[i].skip = nodes[j]
 
-    def calculate_tf_idf(self):
+    def get_doc_ids(self):
+        """Return the set of doc_ids that appear in at least one postings list."""
+        all_docs = set()
+        for plist in self.inverted_index.values():
+            all_docs.update(plist.get_all_doc_ids())
+        return all_docs
+
+    def get_doc_freqs(self):
+        """Return {term: document frequency} for every term in the index."""
+        return {term: plist.get_length() for term, plist in self.inverted_index.items()}
+
+    def calculate_tf_idf(self, total_docs=None, doc_freqs=None):
         """
         
         Calculates TF-IDF score for each node (document) in the postings lists.
@@ -84,16 +120,17 @@ class Indexer:
         - TF = frequency(term in doc) / total tokens in doc
         - IDF = (total number of documents / document frequency of term)
         - TF-IDF = TF * IDF
+
+        total_docs / doc_freqs override the local statistics, so a shard
+        holding part of the corpus can score with corpus-wide idf.
         """
         # Step 1: find total number of unique documents
-        all_docs = set()
-        for plist in self.inverted_index.values():
-            all_docs.update(plist.get_all_doc_ids())
-        total_docs = len(all_docs)
+        if total_docs is None:
+            total_docs = len(self.get_doc_ids())
 
         # Step 2: compute TF-IDF for each term
         for term, plist in self.inverted_index.items():
-            df = plist.get_length()
+            df = plist.get_length() if doc_freqs is None else doc_freqs[term]
             if df == 0:
                 continue
             idf = total_docs / df  # per project spec (no log)
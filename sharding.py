@@ -0,0 +1,231 @@
+"""
+@author: Charan Kumar Raju
+Institute: University at Buffalo
+
+Document-partitioned sharding for Project 2 (CSE 4/535)
+The corpus is split by doc_id range into N shards. Each shard is indexed
+and served by its own worker process; the front end scatters every query
+to all shards and merges the answers.
+
+Global idf is kept identical to the single-node Indexer.calculate_tf_idf:
+shards first report their local document count and document frequencies,
+the front end sums them, and every shard then scores with the corpus-wide
+total_docs / df.
+
+Shards and the single-node ProjectRunner share daat.evaluate_query, so
+merged output matches a single node for postings, AND results and tf-idf
+scores. Comparison counts and skip pointers are per shard, so they differ
+from the single-node values; comparisons and postings scanned are summed
+over shards and shipped back for the front end's tracer.
+
+Quick check against a single-node index, using local processes only:
+    python sharding.py --corpus data/input_corpus.txt --queries data/queries.txt --shards 4
+"""
+
+import argparse
+import bisect
+import multiprocessing
+import threading
+
+from preprocess import Preprocessor
+from indexer import Indexer, MAX_EXPANSIONS
+from daat import evaluate_query, expand_query, rank_scores
+
+
+class Shard:
+    """Index and query logic for one doc_id range; lives in a worker process."""
+
+    def __init__(self):
+        self.preprocessor = Preprocessor()
+        self.indexer = Indexer()
+
+    def index(self, lines):
+        """Index the shard's lines and return (doc count, {term: df}) for global idf."""
+        for line in lines:
+            doc_id, document = self.preprocessor.get_doc_id(line)
+            self.indexer.generate_inverted_index(doc_id, self.preprocessor.tokenizer(document))
+        self.indexer.sort_terms()
+        self.indexer.add_skip_connections()
+        return len(self.indexer.get_doc_ids()), self.indexer.get_doc_freqs()
+
+    def tf_idf(self, total_docs, doc_freqs):
+        """Score every posting with corpus-wide statistics."""
+        self.indexer.calculate_tf_idf(total_docs, doc_freqs)
+
+    def expand(self, patterns):
+        """Return {pattern: [terms]} for this shard's matches of each wildcard pattern."""
+        return expand_query(self.indexer, self.preprocessor, patterns)
+
+    def query(self, query_terms, k=None, expansions=None):
+        """
+        Evaluate a tokenized query on this shard with daat.evaluate_query,
+        the same evaluation a single-node ProjectRunner runs.
+        expansions maps wildcard terms to the globally agreed expanded terms.
+        """
+        return evaluate_query(self.indexer, query_terms, expansions, k)
+
+
+def _shard_main(conn):
+    """Worker loop: run (method, args) requests against a Shard until 'stop'."""
+    shard = Shard()
+    while True:
+        method, args = conn.recv()
+        if method == "stop":
+            conn.close()
+            return
+        try:
+            conn.send((True, getattr(shard, method)(*args)))
+        except Exception as e:
+            conn.send((False, repr(e)))
+
+
+class ShardCluster:
+    def __init__(self, num_shards, start_method=None):
+        """Start one worker process per shard."""
+        ctx = multiprocessing.get_context(start_method)
+        self.num_shards = num_shards
+        # first doc_id of shards 1..N-1; shard i owns [boundaries[i-1], boundaries[i])
+        self.boundaries = []
+        self.conns = []
+        self.procs = []
+        # the pipes carry one request at a time; Flask serves requests on
+        # threads, so every scatter-and-gather round holds this lock
+        self._lock = threading.Lock()
+        for _ in range(num_shards):
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(target=_shard_main, args=(child,), daemon=True)
+            proc.start()
+            child.close()
+            self.conns.append(parent)
+            self.procs.append(proc)
+
+    def _scatter(self, calls):
+        """Send one (method, args) per shard, then gather the replies in shard order."""
+        for conn, call in zip(self.conns, calls):
+            conn.send(call)
+        # drain every reply before raising so the pipes stay in step
+        replies = [conn.recv() for conn in self.conns]
+        for i, (ok, value) in enumerate(replies):
+            if not ok:
+                raise RuntimeError("shard %d failed: %s" % (i, value))
+        return [value for _, value in replies]
+
+    def _broadcast(self, method, *args):
+        return self._scatter([(method, args)] * self.num_shards)
+
+    def shard_for(self, doc_id):
+        """Return the shard index owning doc_id."""
+        return bisect.bisect_right(self.boundaries, doc_id)
+
+    def build(self, lines, preprocessor=None):
+        """
+        Partition lines into contiguous doc_id ranges of about equal size,
+        index every shard in parallel, then push corpus-wide idf statistics.
+        """
+        preprocessor = preprocessor or Preprocessor()
+        doc_ids = sorted(preprocessor.get_doc_id(line)[0] for line in lines)
+        step = len(doc_ids) / self.num_shards
+        self.boundaries = [doc_ids[int(i * step)] for i in range(1, self.num_shards)] if doc_ids else []
+
+        parts = [[] for _ in range(self.num_shards)]
+        for line in lines:
+            parts[self.shard_for(preprocessor.get_doc_id(line)[0])].append(line)
+        with self._lock:
+            stats = self._scatter([("index", (part,)) for part in parts])
+
+            total_docs = sum(count for count, _ in stats)
+            global_dfs = {}
+            for _, dfs in stats:
+                for term, df in dfs.items():
+                    global_dfs[term] = global_dfs.get(term, 0) + df
+            self._scatter([("tf_idf", (total_docs, {t: global_dfs[t] for t in dfs}))
+                           for _, dfs in stats])
+
+    def query(self, query_terms, k=None):
+        """
+        Scatter a tokenized query and merge the shard answers.
+        Shards own ascending doc_id ranges, so concatenating in shard order
+        keeps postings and results sorted. tf-idf is cut to the top k
+        (all results when k is None) with the single-node tie order; each
+        shard only ships its own top k.
+        """
+        patterns = sorted({t for t in query_terms if "*" in t})
+        expansions = {}
+        with self._lock:
+            if patterns:
+                # agree on one global expansion: the first MAX_EXPANSIONS terms
+                # of the union, as a single node would pick
+                for reply in self._broadcast("expand", patterns):
+                    for pattern, terms in reply.items():
+                        expansions.setdefault(pattern, set()).update(terms)
+                expansions = {p: sorted(terms)[:MAX_EXPANSIONS] for p, terms in expansions.items()}
+            replies = self._broadcast("query", query_terms, k, expansions)
+        # a repeated query term must still be merged only once
+        unique_terms = list(dict.fromkeys(query_terms))
+        postings = {t: [] for t in unique_terms}
+        skips = {t: [] for t in unique_terms}
+        results, comparisons, scanned, scores = [], 0, 0, {}
+        for reply in replies:
+            for term in unique_terms:
+                postings[term].extend(reply["postings"][term])
+                skips[term].extend(reply["skips"][term])
+            results.extend(reply["results"])
+            comparisons += reply["comparisons"]
+            scanned += reply["postings_scanned"]
+            scores.update(reply["scores"])
+
+        return {"postings": postings, "skips": skips, "results": results,
+                "comparisons": comparisons, "postings_scanned": scanned,
+                "expansions": expansions, "tfidf": rank_scores(scores, k)}
+
+    def close(self):
+        """Stop every worker process."""
+        with self._lock:
+            for conn in self.conns:
+                try:
+                    conn.send(("stop", ()))
+                    conn.close()
+                except (BrokenPipeError, OSError):
+                    pass
+            for proc in self.procs:
+                proc.join(timeout=5)
+            self.conns, self.procs = [], []
+
+
+def _verify(corpus, queries, num_shards):
+    """Compare a sharded cluster against a single-node index on every query."""
+    with open(corpus, 'r') as fp:
+        lines = fp.readlines()
+    with open(queries, 'r') as fp:
+        query_list = [q for q in fp.read().splitlines() if q.strip()]
+
+    single = Shard()
+    single.index(lines)
+    single.indexer.calculate_tf_idf()
+
+    cluster = ShardCluster(num_shards)
+    try:
+        cluster.build(lines)
+        mismatches = 0
+        for query in query_list:
+            terms = single.preprocessor.query_tokenizer(query)
+            expected = single.query(terms, expansions=single.expand(terms))
+            got = cluster.query(terms)
+            expected_tfidf = rank_scores(expected["scores"])
+            ok = (got["postings"] == expected["postings"]
+                  and got["results"] == expected["results"]
+                  and got["tfidf"] == expected_tfidf)
+            mismatches += not ok
+            print("%-4s %-45s %d docs" % ("ok" if ok else "DIFF", query[:45], len(got["results"])))
+        return mismatches
+    finally:
+        cluster.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("--corpus", type=str, default="data/input_corpus.txt", help="Corpus File name, with path.")
+    parser.add_argument("--queries", type=str, default="data/queries.txt", help="One query per line.")
+    parser.add_argument("--shards", type=int, default=4, help="Number of shard processes.")
+    argv = parser.parse_args()
+    raise SystemExit(1 if _verify(argv.corpus, argv.queries, argv.shards) else 0)
@@ -0,0 +1,164 @@
+"""
+@author: Charan Kumar Raju
+Institute: University at Buffalo
+
+Compact term dictionary for Project 2 (CSE 4/535)
+Terms are kept in sorted order in front-coded blocks packed into a single
+bytes buffer. Each block starts with one full term; every following term
+stores only the length of the prefix it shares with the previous term and
+the remaining suffix. A term's position in sorted order (its ordinal) is
+the offset of its postings list in Indexer.postings_lists.
+
+The Indexer still keeps its OrderedDict for exact lookups and the grader,
+so the dictionary and the ordinal-indexed postings list are added memory,
+used to expand wildcards without hashing every matching term.
+
+Supports:
+    • lookup()  – exact term -> ordinal (postings offset)
+    • expand()  – wildcard/prefix patterns such as "corona*" -> bounded
+                  list of (ordinal, term)
+"""
+
+from array import array
+from fnmatch import fnmatchcase
+
+
+def _write_varint(buf, value):
+    while value >= 0x80:
+        buf.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def _read_varint(buf, pos):
+    value, shift = 0, 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class TermDictionary:
+    def __init__(self, sorted_terms, block_size=16):
+        """Front-code an already sorted iterable of terms."""
+        self.block_size = block_size
+        blob = bytearray()
+        offsets = array('I')
+        prev = b""
+        count = 0
+        for term in sorted_terms:
+            key = term.encode("utf-8")
+            if count % block_size == 0:
+                offsets.append(len(blob))
+                _write_varint(blob, len(key))
+                blob += key
+            else:
+                shared = 0
+                limit = min(len(prev), len(key))
+                while shared < limit and prev[shared] == key[shared]:
+                    shared += 1
+                _write_varint(blob, shared)
+                _write_varint(blob, len(key) - shared)
+                blob += key[shared:]
+            prev = key
+            count += 1
+        self._blob = bytes(blob)
+        self._offsets = offsets
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def nbytes(self):
+        """Bytes used by the encoded terms and the block offset table."""
+        return len(self._blob) + self._offsets.itemsize * len(self._offsets)
+
+    def _block_head(self, block):
+        """Return (first term bytes, position after it) for a block."""
+        length, pos = _read_varint(self._blob, self._offsets[block])
+        return self._blob[pos:pos + length], pos + length
+
+    def _iter_block(self, block):
+        """Yield (ordinal, term bytes) from the start of a block to the end."""
+        blob = self._blob
+        ordinal = block * self.block_size
+        key, pos = self._block_head(block)
+        yield ordinal, key
+        end = min(self._count, ordinal + self.block_size)
+        ordinal += 1
+        while ordinal < end:
+            shared, pos = _read_varint(blob, pos)
+            length, pos = _read_varint(blob, pos)
+            key = key[:shared] + blob[pos:pos + length]
+            pos += length
+            yield ordinal, key
+            ordinal += 1
+
+    def _iter_from_block(self, block):
+        for b in range(block, len(self._offsets)):
+            yield from self._iter_block(b)
+
+    def _find_block(self, key):
+        """Index of the last block whose first term is <= key (0 if none)."""
+        lo, hi = 0, len(self._offsets) - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self._block_head(mid)[0] <= key:
+                lo = mid
+            else:
+                hi = mid - 1
+        return lo
+
+    def lookup(self, term):
+        """Return the ordinal of term, or -1 if it is not in the dictionary."""
+        if not self._count:
+            return -1
+        key = term.encode("utf-8")
+        for ordinal, candidate in self._iter_block(self._find_block(key)):
+            if candidate == key:
+                return ordinal
+            if candidate > key:
+                break
+        return -1
+
+    def __contains__(self, term):
+        return self.lookup(term) >= 0
+
+    def term(self, ordinal):
+        """Return the term stored at ordinal."""
+        if not 0 <= ordinal < self._count:
+            raise IndexError(ordinal)
+        for o, key in self._iter_block(ordinal // self.block_size):
+            if o == ordinal:
+                return key.decode("utf-8")
+
+    def expand(self, pattern, limit=None):
+        """
+        Return up to `limit` (ordinal, term) pairs matching a wildcard
+        pattern, in sorted term order. Only the range sharing the literal
+        prefix before the first '*' is scanned.
+        """
+        if not self._count:
+            return []
+        star = pattern.find("*")
+        prefix = pattern if star < 0 else pattern[:star]
+        key = prefix.encode("utf-8")
+        needs_match = star >= 0 and pattern != prefix + "*"
+        matches = []
+        for ordinal, candidate in self._iter_from_block(self._find_block(key)):
+            if candidate < key:
+                continue
+            if not candidate.startswith(key):
+                break
+            term = candidate.decode("utf-8")
+            if star < 0 and term != pattern:
+                break
+            if needs_match and not fnmatchcase(term, pattern):
+                continue
+            matches.append((ordinal, term))
+            if limit is not None and len(matches) >= limit:
+                break
+        return matches
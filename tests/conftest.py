@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# the pure-Python stemmer needs no NLTK data; shard workers inherit this
+os.environ["P2_STEMMER"] = "porter"
+
+CORPUS = os.path.join(ROOT, "data", "input_corpus.txt")
+
+
+@pytest.fixture(scope="session")
+def corpus_lines():
+    with open(CORPUS, 'r', encoding='utf-8') as fp:
+        return fp.readlines()
+
+
+@pytest.fixture(scope="session")
+def corpus_shard(corpus_lines):
+    """Single in-process shard over the whole corpus, scored like one node."""
+    from sharding import Shard
+    shard = Shard()
+    shard.index(corpus_lines)
+    shard.indexer.calculate_tf_idf()
+    return shard
@@ -0,0 +1,100 @@
+from docstore import DocStore
+from preprocess import Preprocessor
+
+
+def test_snippet_escapes_corpus_markup():
+    preprocessor = Preprocessor("porter")
+    store = DocStore("unused")
+    snippet = store.snippet("a <script>alert(1)</script> virus & co",
+                            preprocessor.query_tokenizer("virus"), preprocessor)
+    assert snippet == "a &lt;script&gt;alert(1)&lt;/script&gt; <em>virus</em> &amp; co"
+
+
+def test_title_is_escaped():
+    assert DocStore("unused").title("<b>x</b> & y") == "&lt;b&gt;x&lt;/b&gt; &amp; y"
+
+
+def test_finalize_sorts_offsets_and_maps_file(tmp_path):
+    corpus = tmp_path / "corpus.txt"
+    lines = ["30\tthird document\n", "10\tfirst document\n", "20\tsecond ünïcode document\n"]
+    corpus.write_bytes("".join(lines).encode("utf-8"))
+
+    store, offset = DocStore(str(corpus)), 0
+    for line in lines:
+        raw = line.encode("utf-8")
+        store.add(int(line.split("\t")[0]), offset, len(raw))
+        offset += len(raw)
+    store.finalize()
+    try:
+        assert list(store.doc_ids) == [10, 20, 30]
+        assert store._mm is not None
+        assert store.get_text(10) == "first document"
+        assert store.get_text(20) == "second ünïcode document"
+        assert store.get_text(30) == "third document"
+        assert store.get_text(15) is None
+    finally:
+        store.close()
+
+
+def test_finalize_on_empty_store(tmp_path):
+    corpus = tmp_path / "empty.txt"
+    corpus.write_bytes(b"")
+    store = DocStore(str(corpus))
+    store.finalize()
+    assert store.get_text(1) is None
+
+
+def test_snippet_highlights_stems_and_wildcards():
+    preprocessor = Preprocessor("porter")
+    snippet = DocStore("unused").snippet(
+        "Studies of the novel Coronavirus pandemic", preprocessor.query_tokenizer("study corona*"),
+        preprocessor, {"corona*": ["coronaviru"]})
+    assert snippet == "<em>Studies</em> of the novel <em>Coronavirus</em> pandemic"
+
+
+def test_snippet_highlights_the_expansion_not_the_raw_pattern():
+    preprocessor = Preprocessor("porter")
+    snippet = DocStore("unused").snippet(
+        "National Nations nationwide", ["national*"], preprocessor, {"national*": ["nation"]})
+    assert snippet == "<em>National</em> <em>Nations</em> nationwide"
+    assert DocStore("unused").snippet("Corona", ["corona*"], preprocessor) == "Corona"
+
+
+def test_snippet_windows_around_first_hit():
+    preprocessor = Preprocessor("porter")
+    words = ["w%d" % i for i in range(50)]
+    words[30] = "virus"
+    snippet = DocStore("unused").snippet(" ".join(words), ["viru"], preprocessor, window=9)
+    # window // 3 words of lead-in, then the rest of the window
+    assert snippet == "… w27 w28 w29 <em>virus</em> w31 w32 w33 w34 w35 …"
+
+
+def test_snippet_without_hits_starts_at_the_beginning():
+    preprocessor = Preprocessor("porter")
+    text = " ".join("w%d" % i for i in range(10))
+    assert DocStore("unused").snippet(text, ["viru"], preprocessor, window=3) == "w0 w1 w2 …"
+    assert DocStore("unused").snippet("", ["viru"], preprocessor) == ""
+
+
+def test_title_cuts_at_word_boundary():
+    store = DocStore("unused")
+    assert store.title("short title") == "short title"
+    assert store.title("word " * 40, max_chars=30) == "word word word word word word…"
+
+
+def test_offsets_read_back_the_corpus(corpus_lines):
+    from conftest import CORPUS
+    preprocessor = Preprocessor("porter")
+    store, offset = DocStore(CORPUS), 0
+    with open(CORPUS, 'rb') as fp:
+        for raw in fp:
+            store.add(preprocessor.get_doc_id(raw.decode("utf-8"))[0], offset, len(raw))
+            offset += len(raw)
+    store.finalize()
+    try:
+        assert len(store) == len(corpus_lines)
+        for line in corpus_lines[::97]:
+            doc_id, text = preprocessor.get_doc_id(line)
+            assert store.get_text(doc_id) == text.strip()
+    finally:
+        store.close()
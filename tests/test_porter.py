@@ -0,0 +1,54 @@
+import pytest
+
+import preprocess
+from porter import PorterStemmer
+from preprocess import Preprocessor
+
+# examples from Porter (1980), "An algorithm for suffix stripping"
+PORTER_EXAMPLES = [
+    ("caresses", "caress"), ("ponies", "poni"), ("ties", "ti"), ("caress", "caress"),
+    ("cats", "cat"), ("feed", "feed"), ("agreed", "agre"), ("plastered", "plaster"),
+    ("motoring", "motor"), ("sing", "sing"), ("conflated", "conflat"),
+    ("troubled", "troubl"), ("sized", "size"), ("hopping", "hop"), ("tanned", "tan"),
+    ("falling", "fall"), ("hissing", "hiss"), ("fizzed", "fizz"), ("failing", "fail"),
+    ("filing", "file"), ("happy", "happi"), ("sky", "sky"), ("relational", "relat"),
+    ("conditional", "condit"), ("rational", "ration"), ("digitizer", "digit"),
+    ("triplicate", "triplic"), ("formative", "form"), ("hopeful", "hope"),
+    ("goodness", "good"), ("revival", "reviv"), ("allowance", "allow"),
+    ("inference", "infer"), ("airliner", "airlin"), ("adjustable", "adjust"),
+    ("defensible", "defens"), ("irritant", "irrit"), ("replacement", "replac"),
+    ("adjustment", "adjust"), ("dependent", "depend"), ("adoption", "adopt"),
+    ("communism", "commun"), ("activate", "activ"), ("homologous", "homolog"),
+    ("effective", "effect"), ("bowdlerize", "bowdler"), ("probate", "probat"),
+    ("rate", "rate"), ("cease", "ceas"), ("controll", "control"), ("roll", "roll"),
+    ("generalizations", "gener"),
+]
+
+
+@pytest.mark.parametrize("word,stem", PORTER_EXAMPLES)
+def test_porter_examples(word, stem):
+    assert PorterStemmer().stem(word) == stem
+
+
+def test_short_words_are_unchanged():
+    stemmer = PorterStemmer()
+    assert [stemmer.stem(w) for w in ("a", "is", "as")] == ["a", "is", "as"]
+
+
+def test_tokenizer_with_pure_python_stemmer():
+    preprocessor = Preprocessor("porter")
+    assert preprocessor.tokenizer("Is hydroxychloroquine effective against the Pandemic?") == \
+        ["hydroxychloroquin", "effect", "pandem"]
+    # query tokenization without wildcards matches document tokenization
+    text = "Epidemiological and clinical characteristics of COVID-19"
+    assert preprocessor.query_tokenizer(text) == preprocessor.tokenizer(text)
+
+
+def test_stem_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(preprocess, "STEM_CACHE_SIZE", 4)
+    preprocessor = Preprocessor("porter")
+    assert [preprocessor.stem(w) for w in ("cats", "ponies", "cats")] == ["cat", "poni", "cat"]
+    for i in range(20):
+        preprocessor.stem("word%d" % i)
+    info = preprocessor.stem.cache_info()
+    assert info.maxsize == 4 and info.currsize == 4 and info.hits == 1
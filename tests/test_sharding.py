@@ -0,0 +1,102 @@
+import threading
+
+import pytest
+
+from daat import evaluate_query, expand_query, rank_scores
+from sharding import ShardCluster
+
+QUERIES = [
+    "the novel coronavirus",
+    "from an epidemic to a pandemic",
+    "is hydroxychloroquine effective?",
+    "covid 19 clinical characteristics",
+    "zzzznotaword",
+    "corona* pneumonia",
+    "studies*",
+    "*virus",
+    "virus virus",
+]
+
+
+@pytest.fixture(scope="module")
+def cluster(corpus_lines):
+    cluster = ShardCluster(3)
+    cluster.build(corpus_lines)
+    yield cluster
+    cluster.close()
+
+
+def _single_node(shard, query):
+    """Evaluate like ProjectRunner._evaluate on one index over the whole corpus."""
+    terms = shard.preprocessor.query_tokenizer(query)
+    expansions = expand_query(shard.indexer, shard.preprocessor, terms)
+    expected = evaluate_query(shard.indexer, terms, expansions)
+    expected["tfidf"] = rank_scores(expected.pop("scores"))
+    return terms, expected
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_sharded_matches_single_node(corpus_shard, cluster, query):
+    terms, expected = _single_node(corpus_shard, query)
+    got = cluster.query(terms)
+    assert got["postings"] == expected["postings"]
+    assert got["results"] == expected["results"]
+    assert got["tfidf"] == expected["tfidf"]
+
+
+def test_sharded_top_k_is_prefix_of_full_ranking(corpus_shard, cluster):
+    terms = corpus_shard.preprocessor.query_tokenizer("covid pneumonia")
+    assert cluster.query(terms, k=5)["tfidf"] == cluster.query(terms)["tfidf"][:5]
+
+
+def test_concurrent_queries_get_their_own_replies(corpus_shard, cluster):
+    expected = {q: _single_node(corpus_shard, q)[1]["results"] for q in QUERIES}
+    errors = []
+
+    def worker(query):
+        terms = corpus_shard.preprocessor.query_tokenizer(query)
+        for _ in range(30):
+            if cluster.query(terms)["results"] != expected[query]:
+                errors.append(query)
+
+    threads = [threading.Thread(target=worker, args=(q,), daemon=True) for q in QUERIES]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=60)
+    # unguarded pipes deadlock or hand replies to the wrong thread
+    assert not any(t.is_alive() for t in threads)
+    assert errors == []
+
+
+def test_shard_for_uses_range_boundaries(cluster):
+    assert cluster.shard_for(-1) == 0
+    assert cluster.shard_for(cluster.boundaries[0]) == 1
+    assert cluster.shard_for(10 ** 12) == cluster.num_shards - 1
+
+
+def test_sharded_runner_matches_single_node_runner(monkeypatch):
+    """Drive the real ProjectRunner in both modes; needs the app's dependencies."""
+    pytest.importorskip("flask")
+    pytest.importorskip("tqdm")
+    from conftest import CORPUS
+    import app
+
+    monkeypatch.delenv("P2_SHARDS", raising=False)
+    single = app.ProjectRunner()
+    single.run_indexer(CORPUS)
+    expected = single.run_queries(QUERIES, "")
+
+    monkeypatch.setenv("P2_SHARDS", "3")
+    sharded = app.ProjectRunner()
+    try:
+        sharded.run_indexer(CORPUS)
+        got = sharded.run_queries(QUERIES, "")
+    finally:
+        sharded.cluster.close()
+
+    assert got["postingsList"] == expected["postingsList"]
+    assert got["daatAndTfIdf"] == expected["daatAndTfIdf"]
+    for query, entry in expected["daatAnd"].items():
+        assert got["daatAnd"][query]["results"] == entry["results"]
+        assert got["daatAnd"][query]["num_docs"] == entry["num_docs"]
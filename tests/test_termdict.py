@@ -0,0 +1,73 @@
+from fnmatch import fnmatchcase
+
+import pytest
+
+from termdict import TermDictionary, _read_varint, _write_varint
+
+TERMS = sorted(["a", "ab", "abc", "abd", "b", "corona", "coronaviru", "covid",
+                "covid19", "studi", "virus", "zeta", "épidém", "ünïcode"])
+
+
+@pytest.mark.parametrize("value", [0, 1, 127, 128, 300, 2 ** 21, 2 ** 32 + 5])
+def test_varint_round_trip(value):
+    buf = bytearray()
+    _write_varint(buf, value)
+    assert _read_varint(buf, 0) == (value, len(buf))
+
+
+@pytest.mark.parametrize("block_size", [1, 2, 3, 16])
+def test_lookup_and_term_across_block_sizes(block_size):
+    td = TermDictionary(TERMS, block_size=block_size)
+    assert len(td) == len(TERMS)
+    for ordinal, term in enumerate(TERMS):
+        assert td.lookup(term) == ordinal
+        assert td.term(ordinal) == term
+    for missing in ["", "0", "aa", "abcd", "coron", "zzz"]:
+        assert td.lookup(missing) == -1
+        assert missing not in td
+    with pytest.raises(IndexError):
+        td.term(len(TERMS))
+
+
+@pytest.mark.parametrize("block_size", [2, 16])
+@pytest.mark.parametrize("pattern", ["a*", "ab*", "co*", "cov*d*", "*d", "*", "corona",
+                                     "covid", "x*", "z*", "é*", "*i*"])
+def test_expand_matches_fnmatch(block_size, pattern):
+    td = TermDictionary(TERMS, block_size=block_size)
+    expected = [(i, t) for i, t in enumerate(TERMS) if fnmatchcase(t, pattern)]
+    assert td.expand(pattern) == expected
+    assert td.expand(pattern, limit=2) == expected[:2]
+
+
+def test_empty_dictionary():
+    td = TermDictionary(())
+    assert len(td) == 0
+    assert td.lookup("a") == -1
+    assert td.expand("a*") == []
+
+
+def test_corpus_dictionary_matches_index(corpus_shard):
+    index = corpus_shard.indexer.get_index()
+    terms = list(index.keys())
+    td = corpus_shard.indexer.term_dict
+    assert terms == sorted(terms)
+    assert all(td.lookup(t) == i for i, t in enumerate(terms))
+    for pattern in ["corona*", "*virus", "c*v*d", "0*"]:
+        expected = [t for t in terms if fnmatchcase(t, pattern)][:64]
+        assert [t for _, t in td.expand(pattern, 64)] == expected
+
+
+def test_expand_wildcard_merges_patterns(corpus_shard):
+    indexer = corpus_shard.indexer
+    merged = [t for t, _ in indexer.expand_wildcard(["studies*", "studi"])]
+    assert merged == sorted(set(merged))
+    assert "studi" in merged
+    assert all(indexer.get_index()[t] is plist
+               for t, plist in indexer.expand_wildcard(["corona*"]))
+
+
+def test_ordinal_is_postings_offset(corpus_shard):
+    indexer = corpus_shard.indexer
+    index, td = indexer.get_index(), indexer.term_dict
+    assert len(indexer.postings_lists) == len(td) == len(index)
+    assert all(indexer.postings_lists[td.lookup(t)] is plist for t, plist in index.items())
@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+from tracing import Tracer
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer()
+    with tracer.query() as trace:
+        with tracer.stage("query.intersect"):
+            tracer.incr("comparisons", 3)
+    assert trace.breakdown is None
+    assert tracer.metrics()["stages"] == {}
+    assert tracer.metrics()["counters"] == {}
+
+
+def test_enabled_tracer_aggregates_and_breaks_down_per_query():
+    tracer = Tracer(enabled=True)
+    for _ in range(2):
+        with tracer.query() as trace:
+            with tracer.stage("query.intersect"):
+                tracer.incr("comparisons", 3)
+    assert trace.breakdown["counters"] == {"comparisons": 3}
+    assert set(trace.breakdown["stages"]) == {"query.intersect"}
+    metrics = tracer.metrics()
+    assert metrics["stages"]["query.intersect"]["calls"] == 2
+    assert metrics["counters"] == {"comparisons": 6}
+
+
+def test_concurrent_profile_is_skipped(tmp_path):
+    tracer = Tracer(enabled=True, profile_rate=1.0, profile_dir=str(tmp_path))
+    with tracer.profile() as outer:
+        with tracer.profile() as inner:
+            pass
+    assert outer.active is False and inner.active is False
+    assert tracer.metrics()["counters"] == {"profiles_dumped": 1}
+    assert len(os.listdir(tmp_path)) == 1
+    with tracer.profile():
+        pass
+    assert tracer.metrics()["counters"] == {"profiles_dumped": 2}
+
+
+def test_invalid_profile_rate_falls_back_to_zero(monkeypatch):
+    monkeypatch.setenv("P2_PROFILE_RATE", "five percent")
+    with pytest.warns(UserWarning, match="P2_PROFILE_RATE"):
+        tracer = Tracer.from_env()
+    assert tracer.profile_rate == 0.0
@@ -0,0 +1,36 @@
+from fnmatch import fnmatchcase
+
+import pytest
+
+
+def _count(shard, query):
+    terms = shard.preprocessor.query_tokenizer(query)
+    expansions = shard.expand([t for t in terms if "*" in t])
+    return len(shard.query(terms, expansions=expansions)["results"])
+
+
+@pytest.mark.parametrize("word", ["coronavirus", "studies"])
+def test_wildcard_never_returns_fewer_docs_than_the_word(corpus_shard, word):
+    assert _count(corpus_shard, word) > 0
+    assert _count(corpus_shard, word + "*") >= _count(corpus_shard, word)
+
+
+def test_wildcard_covers_the_stemmed_prefix(corpus_shard):
+    assert _count(corpus_shard, "coronavirus*") >= _count(corpus_shard, "coronavirus")
+
+
+def test_wildcard_patterns_adds_exact_stem(corpus_shard):
+    preprocessor = corpus_shard.preprocessor
+    assert preprocessor.wildcard_patterns("studies*") == ["studies*", "studi"]
+    assert preprocessor.wildcard_patterns("national*") == ["national*", "nation"]
+    assert preprocessor.wildcard_patterns("corona*") == ["corona*"]
+    assert preprocessor.wildcard_patterns("*virus") == ["*virus"]
+    assert preprocessor.wildcard_patterns("stud*es*") == ["stud*es*"]
+
+
+@pytest.mark.parametrize("pattern", ["national*", "effective*", "studies*", "corona*"])
+def test_wildcard_expansion_is_prefix_match_or_exact_stem(corpus_shard, pattern):
+    stem = corpus_shard.preprocessor.stem(pattern.rstrip("*"))
+    expanded = corpus_shard.expand([pattern])[pattern]
+    assert expanded
+    assert all(fnmatchcase(t, pattern) or t == stem for t in expanded)
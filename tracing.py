@@ -0,0 +1,206 @@
+"""
+@author: Charan Kumar Raju
+Institute: University at Buffalo
+
+Lightweight per-stage instrumentation for Project 2 (CSE 4/535)
+Provides:
+    • Tracer.stage()    – context manager timing one named stage
+    • Tracer.incr()     – named counters (comparisons, postings scanned, ...)
+    • Tracer.query()    – per-query breakdown of stages and counters
+    • Tracer.profile()  – samples requests into cProfile dumps
+    • Tracer.metrics()  – aggregate snapshot served by /metrics
+
+Configured from the environment so the grader driver stays untouched:
+    P2_TRACE=1               enable stage timers and counters
+    P2_PROFILE_RATE=0.05     fraction of requests dumped with cProfile
+    P2_PROFILE_DIR=profiles  where .prof files are written
+When disabled every hook returns a shared no-op object, so the cost on the
+query path is one attribute check per stage.
+"""
+
+import cProfile
+import os
+import random
+import threading
+import time
+import warnings
+
+
+class _NullContext:
+    """Shared no-op context manager returned while tracing is disabled."""
+
+    breakdown = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL = _NullContext()
+
+# only one cProfile may be active per process (Python 3.12+ raises otherwise),
+# so a request that finds it taken runs unprofiled
+_PROFILE_LOCK = threading.Lock()
+
+
+class _Stage:
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.tracer._record_stage(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _Query:
+    def __init__(self, tracer):
+        self.tracer = tracer
+        self.breakdown = None
+
+    def __enter__(self):
+        self.tracer._local.breakdown = {"stages": {}, "counters": {}}
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.breakdown = self.tracer._local.breakdown
+        self.tracer._local.breakdown = None
+        return False
+
+
+class _Profile:
+    def __init__(self, tracer, label):
+        self.tracer = tracer
+        self.label = label
+        self.profiler = cProfile.Profile()
+        self.active = False
+
+    def __enter__(self):
+        if not _PROFILE_LOCK.acquire(blocking=False):
+            return self
+        try:
+            self.profiler.enable()
+        except ValueError:
+            # another profiler outside the tracer is already running
+            _PROFILE_LOCK.release()
+            return self
+        self.active = True
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self.active:
+            return False
+        try:
+            self.profiler.disable()
+        finally:
+            self.active = False
+            _PROFILE_LOCK.release()
+        os.makedirs(self.tracer.profile_dir, exist_ok=True)
+        path = os.path.join(self.tracer.profile_dir,
+                            "%s-%d-%d.prof" % (self.label, os.getpid(), time.time_ns()))
+        self.profiler.dump_stats(path)
+        self.tracer.incr("profiles_dumped")
+        return False
+
+
+class Tracer:
+    def __init__(self, enabled=False, profile_rate=0.0, profile_dir="profiles"):
+        """Initialize aggregate stage timers, counters and profiling settings."""
+        self.enabled = enabled
+        self.profile_rate = profile_rate
+        self.profile_dir = profile_dir
+        # stage name -> [calls, total seconds, max seconds]
+        self.stages = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @classmethod
+    def from_env(cls):
+        """Build a tracer from the P2_TRACE / P2_PROFILE_* environment variables."""
+        raw_rate = os.environ.get("P2_PROFILE_RATE", "0") or "0"
+        try:
+            profile_rate = float(raw_rate)
+        except ValueError:
+            warnings.warn("ignoring invalid P2_PROFILE_RATE=%r; profiling disabled" % raw_rate)
+            profile_rate = 0.0
+        return cls(enabled=os.environ.get("P2_TRACE", "0") not in ("", "0", "false"),
+                   profile_rate=profile_rate,
+                   profile_dir=os.environ.get("P2_PROFILE_DIR", "profiles"))
+
+    def stage(self, name):
+        """Return a context manager timing the named stage."""
+        if not self.enabled:
+            return _NULL
+        return _Stage(self, name)
+
+    def incr(self, name, n=1):
+        """Add n to the named counter (globally and for the current query)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+        breakdown = getattr(self._local, "breakdown", None)
+        if breakdown is not None:
+            counters = breakdown["counters"]
+            counters[name] = counters.get(name, 0) + n
+
+    def query(self):
+        """Return a context manager collecting a per-query breakdown."""
+        if not self.enabled:
+            return _NULL
+        return _Query(self)
+
+    def profile(self, label="request"):
+        """
+        Return a context manager that cProfiles a sampled fraction of calls.
+        A sampled call is skipped while another one is being profiled.
+        """
+        if self.profile_rate <= 0 or random.random() >= self.profile_rate:
+            return _NULL
+        return _Profile(self, label)
+
+    def _record_stage(self, name, elapsed):
+        with self._lock:
+            entry = self.stages.get(name)
+            if entry is None:
+                self.stages[name] = [1, elapsed, elapsed]
+            else:
+                entry[0] += 1
+                entry[1] += elapsed
+                if elapsed > entry[2]:
+                    entry[2] = elapsed
+        breakdown = getattr(self._local, "breakdown", None)
+        if breakdown is not None:
+            stages = breakdown["stages"]
+            stages[name] = stages.get(name, 0.0) + elapsed
+
+    def metrics(self):
+        """Return a JSON-friendly snapshot of all stage timers and counters."""
+        with self._lock:
+            stages = {name: {"calls": calls,
+                             "total_ms": round(total * 1000, 3),
+                             "avg_ms": round(total * 1000 / calls, 3),
+                             "max_ms": round(peak * 1000, 3)}
+                      for name, (calls, total, peak) in self.stages.items()}
+            counters = dict(self.counters)
+        return {"enabled": self.enabled,
+                "profile_rate": self.profile_rate,
+                "stages": stages,
+                "counters": counters}
+
+    def reset(self):
+        """Clear all aggregate timers and counters."""
+        with self._lock:
+            self.stages = {}
+            self.counters = {}
+
+
+tracer = Tracer.from_env()